@@ -1,7 +1,12 @@
 from src.apps.cron_train_model_app.CronTrainModelApp import CronTrainModelApp
 from src.apps.api_app.ApiApp import ApiApp
+from src.apps.data_profile_app.DataProfileApp import DataProfileApp
+from src.contexts.observability import StructuredLogging
 
 import argparse
+import logging
+
+from dotenv import load_dotenv
 
 
 def main():
@@ -18,7 +23,11 @@ def main():
 
     app_name = args.application
     model_type = args.model_type
-    print(f"\n\n 🏁 start app: {app_name}, model_type: {model_type}")
+    # cron jobs don't inherit the container env, /app/.env is their only config
+    load_dotenv("/app/.env")
+    # cron apps send stdout to /dev/null, so only the rotated file is written
+    StructuredLogging.setup(app_name or "app", log_to_stdout=app_name not in ("TrainModel", "DataProfile"))
+    logging.getLogger(__name__).info("🏁 start app", extra={"app": app_name, "model_type": model_type})
 
     
 
@@ -28,7 +37,7 @@ def main():
         
         Cron_Train_Model_App.start(
             hour=args.range,
-            model_type="genre"
+            model_type=model_type
         )
         return
 
@@ -40,5 +49,10 @@ def main():
         return
 
 
+    if app_name == "DataProfile":
+        DataProfileApp().start()
+        return
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
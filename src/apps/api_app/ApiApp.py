@@ -1,10 +1,19 @@
-from fastapi import FastAPI
+import logging
+import os
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from src.contexts.api.controllers import HealthCheckController
 from src.contexts.api.controllers import TrainModelController
+from src.contexts.api.controllers import DriftController
 from src.contexts.api.controllers.GenrePredictionController import GenrePredictionController
+from src.contexts.observability import DriftMonitor, StructuredLogging
+
+
+logger = logging.getLogger(__name__)
 
 
 class ApiApp:
@@ -17,8 +26,33 @@ class ApiApp:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        self.app.middleware("http")(self.log_request)
+        self.drift_monitor = DriftMonitor(
+            window=int(os.getenv("DRIFT_WINDOW", "5000")),
+            psi_threshold=float(os.getenv("DRIFT_PSI_THRESHOLD", "0.2")),
+            min_observations=int(os.getenv("DRIFT_MIN_OBSERVATIONS", "500"))
+        )
         self.setup_routes()
 
+    async def log_request(self, request: Request, call_next):
+        request_id, tokens = StructuredLogging.start_request(request.headers.get("X-Request-ID"))
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            logger.info(
+                "Request completed",
+                extra={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": response.status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+                }
+            )
+            return response
+        finally:
+            StructuredLogging.end_request(tokens)
+
     def setup_routes(self):
         self.app.add_api_route(
             "/api/health-check",
@@ -27,12 +61,20 @@ class ApiApp:
         )
         
        
+        genre_prediction_controller = GenrePredictionController(drift_monitor=self.drift_monitor)
+        genre_prediction_controller.warm_up()
         self.app.add_api_route(
             "/api/model",
-            GenrePredictionController().execute,
+            genre_prediction_controller.execute,
             methods=["POST"],
         )
 
+        self.app.add_api_route(
+            "/api/model/drift",
+            DriftController(self.drift_monitor).execute,
+            methods=["GET"],
+        )
+
     def start(self):
-        print(f"\n 🚀 init ApiApp")
-        uvicorn.run(self.app, host="0.0.0.0", port=8000)
+        logger.info("🚀 init ApiApp")
+        uvicorn.run(self.app, host="0.0.0.0", port=8000, log_config=None, access_log=False)
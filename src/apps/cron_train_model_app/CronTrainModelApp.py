@@ -1,16 +1,23 @@
 
+import logging
+
 from src.contexts.train_model.TrainModel import TrainModel
 from src.contexts.train_model.TrainGenreModel import TrainGenreModel
 
 
+logger = logging.getLogger(__name__)
+
 
 class CronTrainModelApp:
     def start(self, *, hour, model_type="genre"):
         ########################
-        print(f"start train model cron in hour: {hour}, model_type: {model_type}", flush=True)
+        logger.info("start train model cron", extra={"hour": hour, "model_type": model_type})
         
         if model_type == "genre" or model_type == "classification":
             TrainGenreModel.entrenarModeloGenero()
+        elif model_type == "regression-incremental":
+            # Only reads rows appended since the last run
+            TrainModel.entrenarModelo(incremental=True)
         else:
             # Default to regression model
             TrainModel.entrenarModelo()
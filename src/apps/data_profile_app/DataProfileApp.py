@@ -0,0 +1,19 @@
+import logging
+
+from src.contexts.data_profile.DataProfiler import DataProfiler
+from src.contexts.train_model.TrainGenreModel import TrainGenreModel
+
+
+logger = logging.getLogger(__name__)
+
+
+class DataProfileApp:
+    def start(self):
+        try:
+            report = DataProfiler.profile(min_samples_per_class=TrainGenreModel.MIN_SAMPLES_PER_CLASS)
+        except Exception as e:
+            # A failed profile must not block training; check_report ignores stale reports
+            logger.exception("Data profiling failed: %s", e)
+            return
+        DataProfiler.write_report(report)
+        logger.info("Data profile", extra={"profile": report})
@@ -0,0 +1,9 @@
+from src.contexts.observability import DriftMonitor
+
+
+class DriftController:
+    def __init__(self, drift_monitor: DriftMonitor):
+        self.drift_monitor = drift_monitor
+
+    def execute(self):
+        return self.drift_monitor.drift_scores()
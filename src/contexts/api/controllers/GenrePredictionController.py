@@ -1,20 +1,73 @@
+import logging
 import os
+import socket
+import threading
+import time
 import joblib
 import numpy as np
 import psycopg2
 from typing import Dict, Any
 from dotenv import load_dotenv
+from fastapi import HTTPException
 
 from src.contexts.api.models.GenrePredictionRequest import (
     GenrePredictionRequest, 
     GenrePredictionResponse
 )
+from src.contexts.observability import DriftMonitor
+from src.contexts.api.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    FeatureFallbackCache,
+    TimerScheduler
+)
 from src.contexts.train_model.TrainGenreModel import TrainGenreModel
 
 
+logger = logging.getLogger(__name__)
+
 class GenrePredictionController:
+
+    # libpq rounds connect_timeout up to whole seconds, with a minimum of 2
+    MIN_CONNECT_TIMEOUT_SECONDS = 2
+
+    def __init__(self, drift_monitor: DriftMonitor = None):
+        self.drift_monitor = drift_monitor
+        self._model_data = None
+        self._model_mtime = None
+        self._model_lock = threading.Lock()
+        self.request_timeout = float(os.getenv("API_REQUEST_TIMEOUT_SECONDS", "3"))
+        # below this every request would skip the database (see execute)
+        min_request_timeout = self.MIN_CONNECT_TIMEOUT_SECONDS + 1
+        if self.request_timeout < min_request_timeout:
+            logger.error(
+                "API_REQUEST_TIMEOUT_SECONDS is too low to reach the database, using the minimum",
+                extra={"configured": self.request_timeout, "minimum": min_request_timeout}
+            )
+            self.request_timeout = float(min_request_timeout)
+        self.feature_source_breaker = CircuitBreaker(
+            "feature-db",
+            failure_threshold=int(os.getenv("FEATURE_DB_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("FEATURE_DB_RESET_TIMEOUT_SECONDS", "30"))
+        )
+        self.fallback_cache = FeatureFallbackCache(
+            max_entries=int(os.getenv("FEATURE_FALLBACK_CACHE_SIZE", "10000"))
+        )
+        # one shared thread cancels queries that outlive their deadline
+        self.query_canceller = TimerScheduler("feature-db-canceller")
+        # DNS is resolved off the request path; connects use a single hostaddr
+        # so connect_timeout applies to exactly one attempt
+        self.dns_refresh_seconds = float(os.getenv("FEATURE_DB_DNS_REFRESH_SECONDS", "60"))
+        self._host_address = None
+        self._resolve_host_address()
+        threading.Thread(target=self._refresh_host_address, name="feature-db-dns", daemon=True).start()
+
     def execute(self, request: GenrePredictionRequest):
-        print(f"Genre prediction request: {request}")
+        deadline = Deadline(self.request_timeout)
+        started = time.perf_counter()
+        logger.info("Genre prediction request", extra={"customer_id": request.customer_id})
         
         try:
             # Load the trained genre model
@@ -29,85 +82,232 @@ class GenrePredictionController:
                 }
             
             # Load model and encoders
-            model_data = joblib.load(model_path)
+            model_data = self._load_model_data(model_path)
             model = model_data['model']
             encoders = model_data['label_encoders']
             feature_columns = model_data['feature_columns']
             genre_classes = model_data['genre_classes']
+            if self.drift_monitor is not None:
+                self.drift_monitor.set_reference(model_data.get('reference_stats'))
             
-            # Extract features from database using customer_id
-            customer_features, customer_profile = self._get_features_from_customer_id(request.customer_id)
+            # Extract features from database using customer_id. The breaker
+            # rejects the call right away while the database is failing.
+            features_started = time.perf_counter()
+            try:
+                # Not enough time left to bound the connect: skip the database
+                # without counting it as a feature source failure
+                if deadline.remaining() < self.MIN_CONNECT_TIMEOUT_SECONDS:
+                    raise DeadlineExceeded("Not enough time left to query the feature source")
+                customer_features, customer_profile = self.feature_source_breaker.call(
+                    self._get_features_from_customer_id, request.customer_id, deadline
+                )
+            except (CircuitOpenError, DeadlineExceeded, psycopg2.Error) as e:
+                logger.warning(
+                    "Feature source unavailable, using fallback",
+                    extra={
+                        "customer_id": request.customer_id,
+                        "error": str(e),
+                        "breaker_state": self.feature_source_breaker.state
+                    }
+                )
+                return self._fallback_prediction(request.customer_id, model_data)
+            features_ms = (time.perf_counter() - features_started) * 1000
+
             if customer_features is None:
                 return {
                     "error": f"Customer with ID {request.customer_id} not found."
                 }
+
+            self.fallback_cache.put(request.customer_id, customer_features)
             
             # Make prediction
-            prediction_encoded = model.predict([customer_features])[0]
-            
-            # Decode the prediction
-            predicted_genre = encoders['genre'].inverse_transform([prediction_encoded])[0]
+            predicted_genre = self._predict_genre(model, encoders, customer_features)
+            if self.drift_monitor is not None:
+                self.drift_monitor.observe(customer_features, predicted_genre)
             
             # Create simplified response
             response = GenrePredictionResponse(Genre=predicted_genre)
             
-            print(f"Predicted genre: {predicted_genre} for customer {request.customer_id}")
-            
-            return response.dict()
+            logger.info(
+                "Predicted genre",
+                extra={
+                    "customer_id": request.customer_id,
+                    "predicted_genre": predicted_genre,
+                    "features_ms": round(features_ms, 2),
+                    "total_ms": round((time.perf_counter() - started) * 1000, 2)
+                }
+            )
             
+            return response.dict(exclude_none=True)
+
+        except HTTPException:
+            raise
         except Exception as e:
-            print(f"Error in genre prediction: {str(e)}")
+            logger.exception("Error in genre prediction", extra={"customer_id": request.customer_id})
             return {
                 "error": f"Prediction failed: {str(e)}"
             }
+
+    def _resolve_host_address(self):
+        load_dotenv("/app/.env")
+        host = os.getenv("SUPABASE_HOST")
+        port = os.getenv("SUPABASE_PORT")
+        if not host:
+            return
+        try:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            # keep the last good address
+            logger.warning("Could not resolve database host", extra={"host": host, "error": str(e)})
+            return
+        self._host_address = addresses[0][4][0]
+
+    def _refresh_host_address(self):
+        while True:
+            time.sleep(self.dns_refresh_seconds)
+            self._resolve_host_address()
+
+    def warm_up(self):
+        """
+        Load the model at startup, so the first request does not pay for it
+        and the drift monitor has its reference before any prediction.
+        """
+        model_path = os.getenv("MODELO_GENERO_ENTRENADO", "/app/assets/modelo_genero_entrenado.pkl")
+        if not os.path.exists(model_path):
+            logger.warning("Genre model not found at startup", extra={"model_path": model_path})
+            return
+        try:
+            model_data = self._load_model_data(model_path)
+        except Exception:
+            logger.exception("Could not load genre model at startup", extra={"model_path": model_path})
+            return
+        if self.drift_monitor is not None:
+            self.drift_monitor.set_reference(model_data.get('reference_stats'))
+
+    def _load_model_data(self, model_path: str) -> Dict[str, Any]:
+        """
+        Return the model artifact, reloading it only when the file changes.
+        """
+        mtime = os.stat(model_path).st_mtime_ns
+        if mtime != self._model_mtime:
+            with self._model_lock:
+                if mtime != self._model_mtime:
+                    self._model_data = joblib.load(model_path)
+                    self._model_mtime = mtime
+                    logger.info("Genre model loaded", extra={"model_path": model_path})
+        return self._model_data
+
+    def _predict_genre(self, model, encoders, customer_features):
+        prediction_encoded = model.predict([customer_features])[0]
+        return encoders['genre'].inverse_transform([prediction_encoded])[0]
+
+    def _fallback_prediction(self, customer_id: int, model_data: Dict[str, Any]):
+        """
+        Serve a stale prediction while the feature source is down: first from
+        the last features seen for this customer, then from the predictions
+        precomputed at training time. Raises 503 when neither is available.
+        """
+        cached = self.fallback_cache.get(customer_id)
+        if cached is not None:
+            features, age_seconds = cached
+            predicted_genre = self._predict_genre(
+                model_data['model'], model_data['label_encoders'], features
+            )
+        else:
+            precomputed = model_data.get('precomputed_predictions', {})
+            if customer_id not in precomputed:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Feature source unavailable and no cached prediction for this customer."
+                )
+            predicted_genre = precomputed[customer_id]
+            age_seconds = time.time() - model_data.get('trained_at', time.time())
+
+        logger.info(
+            "Stale predicted genre",
+            extra={
+                "customer_id": customer_id,
+                "predicted_genre": predicted_genre,
+                "staleness_seconds": round(age_seconds, 3)
+            }
+        )
+
+        response = GenrePredictionResponse(
+            Genre=predicted_genre,
+            stale=True,
+            staleness_seconds=round(age_seconds, 3)
+        )
+        return response.dict(exclude_none=True)
     
-    def _get_features_from_customer_id(self, customer_id: int):
+    def _get_features_from_customer_id(self, customer_id: int, deadline: Deadline):
         """
         Extract customer features from database using customer_id.
-        Returns tuple of (features_list, customer_profile_dict)
+        Returns tuple of (features_list, customer_profile_dict).
+        Connection and query time are bounded by the request deadline;
+        database errors are raised so the circuit breaker can count them.
         """
+        # Load environment variables for database connection
+        load_dotenv("/app/.env")
+        USER = os.getenv("SUPABASE_USER")
+        PASSWORD = os.getenv("SUPABASE_PASSWORD")
+        HOST = os.getenv("SUPABASE_HOST")
+        PORT = os.getenv("SUPABASE_PORT")
+        DBNAME = os.getenv("SUPABASE_DBNAME")
+        
+        if not all([USER, PASSWORD, HOST, PORT, DBNAME]):
+            logger.error("Database environment variables not loaded")
+            return None, None
+
+        host_address = self._host_address
+        if host_address is None:
+            raise DeadlineExceeded("Database host address not resolved")
+
+        # connect_timeout is in whole seconds and at least 2 (execute() made sure
+        # that much is left); rounding down keeps the connect inside the deadline.
+        # hostaddr skips DNS and gives libpq a single address to try, so the
+        # timeout covers the whole connect; host is still sent for TLS.
+        connection = psycopg2.connect(
+            user=USER,
+            password=PASSWORD,
+            host=HOST,
+            hostaddr=host_address,
+            port=PORT,
+            dbname=DBNAME,
+            connect_timeout=max(self.MIN_CONNECT_TIMEOUT_SECONDS, int(deadline.remaining()))
+        )
+        # statement_timeout is per statement and the feature lookup can run two,
+        # so cancel whatever is still running when the deadline expires
+        cancel_call = self.query_canceller.schedule(deadline.remaining(), connection.cancel)
         try:
-            # Load environment variables for database connection
-            load_dotenv("/app/.env")
-            USER = os.getenv("SUPABASE_USER")
-            PASSWORD = os.getenv("SUPABASE_PASSWORD")
-            HOST = os.getenv("SUPABASE_HOST")
-            PORT = os.getenv("SUPABASE_PORT")
-            DBNAME = os.getenv("SUPABASE_DBNAME")
-            
-            if not all([USER, PASSWORD, HOST, PORT, DBNAME]):
-                print("Error: Database environment variables not loaded")
-                return None, None
-            
-            with psycopg2.connect(
-                user=USER,
-                password=PASSWORD,
-                host=HOST,
-                port=PORT,
-                dbname=DBNAME
-            ) as connection:
-                
-                customer_data = TrainGenreModel.get_customer_features(customer_id, connection)
-                
-                if customer_data is None:
-                    return None, None
-                
-                # Prepare features in the same order as training
-                features = [
-                    customer_data['total_spent'],
-                    customer_data['total_tracks_bought'],
-                    customer_data['genre_spending_ratio']
-                ]
-                
-                customer_profile = {
-                    "customer_id": customer_data['customer_id'],
-                    "total_spent": customer_data['total_spent'],
-                    "total_tracks_bought": customer_data['total_tracks_bought'],
-                    "genre_spending_ratio": customer_data['genre_spending_ratio']
-                }
-                
-                return features, customer_profile
-                
-        except Exception as e:
-            print(f"Error extracting customer features from database: {e}")
-            return None, None
\ No newline at end of file
+            deadline.check("query")
+            with connection:
+                with connection.cursor() as cursor:
+                    # SET LOCAL so the timeout does not leak into pooled server
+                    # connections (Supabase transaction pooler)
+                    cursor.execute("SET LOCAL statement_timeout = %s", (max(1, deadline.remaining_ms()),))
+                return self._read_customer_features(customer_id, connection)
+        finally:
+            cancel_call.cancel()
+            connection.close()
+
+    def _read_customer_features(self, customer_id: int, connection):
+        customer_data = TrainGenreModel.get_customer_features(customer_id, connection)
+        
+        if customer_data is None:
+            return None, None
+        
+        # Prepare features in the same order as training
+        features = [
+            customer_data['total_spent'],
+            customer_data['total_tracks_bought'],
+            customer_data['genre_spending_ratio']
+        ]
+        
+        customer_profile = {
+            "customer_id": customer_data['customer_id'],
+            "total_spent": customer_data['total_spent'],
+            "total_tracks_bought": customer_data['total_tracks_bought'],
+            "genre_spending_ratio": customer_data['genre_spending_ratio']
+        }
+        
+        return features, customer_profile
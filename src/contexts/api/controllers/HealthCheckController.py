@@ -1,3 +1,6 @@
+from src.contexts.observability import StructuredLogging
+
+
 class HealthCheckController:
     def execute(self):
-        return {"status": "OK"}
+        return {"status": "OK", "dropped_log_records": StructuredLogging.dropped_records()}
@@ -1,15 +1,17 @@
+import logging
 import os
 import joblib
 import numpy as np
-import os
 
 from src.contexts.api.models import PredictorRequest
 
 
+logger = logging.getLogger(__name__)
+
 
 class TrainModelController:
     def execute(self, request: PredictorRequest):
-        print(request)
+        logger.info("Regression prediction request", extra={"sex": request.sex.value, "nuevo": request.nuevo})
         sex=request.sex.value
         nuevo=request.nuevo
        
@@ -23,7 +25,7 @@ class TrainModelController:
 
         # Hacer la predicción
         result = modelo_cargado.predict(nuevo_dato)
-        print(f"Predicción para X=6: {result[0][0]}")
+        logger.info("Regression prediction", extra={"x": nuevo, "result": float(result[0][0])})
         
         return {"status": "OK", "result": result[0][0]}
 
@@ -1,2 +1,3 @@
 from .HealthCheckController import HealthCheckController
-from .TrainModelController import TrainModelController
\ No newline at end of file
+from .TrainModelController import TrainModelController
+from .DriftController import DriftController
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, validator
 
 
@@ -12,4 +13,6 @@ class GenrePredictionRequest(BaseModel):
 
 
 class GenrePredictionResponse(BaseModel):
-    Genre: str
\ No newline at end of file
+    Genre: str
+    stale: bool = False
+    staleness_seconds: Optional[float] = None
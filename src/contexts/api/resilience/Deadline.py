@@ -0,0 +1,30 @@
+import time
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """
+    Time budget for a single request. Every blocking step (DB connect,
+    query) asks the deadline how much time is left instead of using its
+    own fixed timeout, so the whole request stays inside the budget.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._expires_at = time.monotonic() + timeout_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining() * 1000)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def check(self, step: str = "request"):
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.timeout_seconds}s exceeded during {step}")
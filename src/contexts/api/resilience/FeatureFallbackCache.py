@@ -0,0 +1,35 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class FeatureFallbackCache:
+    """
+    Bounded LRU of the last features successfully read from the database,
+    keyed by customer_id. Used to keep serving predictions while the
+    feature source is unavailable.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, customer_id: int, features):
+        with self._lock:
+            self._entries[customer_id] = (list(features), time.time())
+            self._entries.move_to_end(customer_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, customer_id: int):
+        """
+        Returns (features, age_seconds) or None if the customer was never cached.
+        """
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(customer_id)
+        features, stored_at = entry
+        return features, time.time() - stored_at
@@ -0,0 +1,58 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledCall:
+    def __init__(self, when: float, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerScheduler:
+    """
+    One background thread running delayed callbacks, instead of a
+    threading.Timer (one OS thread) per request. Cancelled calls stay in the
+    heap until their time comes and are then skipped.
+    """
+
+    def __init__(self, name: str = "timer-scheduler"):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay: float, callback) -> ScheduledCall:
+        call = ScheduledCall(time.monotonic() + max(0.0, delay), callback)
+        with self._condition:
+            heapq.heappush(self._heap, (call.when, next(self._sequence), call))
+            self._condition.notify()
+        return call
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                when, _, call = self._heap[0]
+                now = time.monotonic()
+                if when > now:
+                    self._condition.wait(when - now)
+                    continue
+                heapq.heappop(self._heap)
+            if call.cancelled:
+                continue
+            try:
+                call.callback()
+            except Exception:
+                logger.exception("Scheduled call failed")
@@ -0,0 +1,4 @@
+from .Deadline import Deadline, DeadlineExceeded
+from .CircuitBreaker import CircuitBreaker, CircuitOpenError
+from .FeatureFallbackCache import FeatureFallbackCache
+from .TimerScheduler import TimerScheduler
@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import psycopg2
+from dotenv import load_dotenv
+
+
+logger = logging.getLogger(__name__)
+
+
+class DataProfiler:
+    """
+    Data diagnostics for the genre training data (replaces diagnose_data.py).
+
+    Three queries, run concurrently on separate connections. Each one reads
+    every table it touches once and uses FILTER aggregates to compute
+    several counts in that pass. invoice_line, the largest table, is read
+    only by the purchases query; the smaller tables are also joined there.
+    """
+
+    CUSTOMER_INVOICE_QUERY = """
+    SELECT
+        COUNT(DISTINCT c.customer_id) AS total_customers,
+        COUNT(i.invoice_id) AS total_invoices,
+        COUNT(i.invoice_id) FILTER (WHERE c.customer_id IS NULL) AS orphan_invoices
+    FROM invoice i
+    FULL JOIN customer c ON c.customer_id = i.customer_id;
+    """
+
+    TRACK_GENRE_QUERY = """
+    SELECT
+        COUNT(DISTINCT g.genre_id) AS total_genres,
+        COUNT(t.track_id) AS total_tracks,
+        COUNT(t.track_id) FILTER (WHERE t.genre_id IS NULL) AS tracks_without_genre,
+        COUNT(t.track_id) FILTER (WHERE t.genre_id IS NOT NULL AND g.genre_id IS NULL) AS tracks_with_orphan_genre
+    FROM track t
+    FULL JOIN genre g ON g.genre_id = t.genre_id;
+    """
+
+    # Single pass over invoice_line; the preferred-genre logic mirrors the
+    # training query so class counts match what TrainGenreModel will see.
+    PURCHASES_QUERY = """
+    WITH line_facts AS MATERIALIZED (
+        SELECT
+            c.customer_id,
+            i.invoice_id IS NULL AS orphan_invoice,
+            t.track_id IS NULL AS orphan_track,
+            t.genre_id IS NOT NULL AS has_genre_id,
+            g.name AS genre_name,
+            il.unit_price * il.quantity AS spent
+        FROM invoice_line il
+        LEFT JOIN invoice i ON i.invoice_id = il.invoice_id
+        LEFT JOIN customer c ON c.customer_id = i.customer_id
+        LEFT JOIN track t ON t.track_id = il.track_id
+        LEFT JOIN genre g ON g.genre_id = t.genre_id
+    ),
+    customer_genre AS (
+        SELECT customer_id, genre_name, SUM(spent) AS spent_on_genre
+        FROM line_facts
+        WHERE customer_id IS NOT NULL AND genre_name IS NOT NULL
+        GROUP BY customer_id, genre_name
+    ),
+    preferred AS (
+        SELECT
+            genre_name,
+            SUM(spent_on_genre) OVER (PARTITION BY customer_id) AS total_spent,
+            ROW_NUMBER() OVER (PARTITION BY customer_id ORDER BY spent_on_genre DESC) AS genre_rank
+        FROM customer_genre
+    )
+    SELECT
+        (
+            SELECT json_build_object(
+                'total_invoice_lines', COUNT(*),
+                'lines_with_orphan_invoice', COUNT(*) FILTER (WHERE orphan_invoice),
+                'lines_with_orphan_track', COUNT(*) FILTER (WHERE orphan_track),
+                'customers_with_purchases', COUNT(DISTINCT customer_id),
+                'customers_with_genre_linked_purchases', COUNT(DISTINCT customer_id) FILTER (WHERE has_genre_id),
+                'customers_after_all_joins', COUNT(DISTINCT customer_id) FILTER (WHERE genre_name IS NOT NULL)
+            )
+            FROM line_facts
+        ) AS purchases,
+        (
+            SELECT COALESCE(json_object_agg(genre_name, customers ORDER BY customers DESC), '{}'::json)
+            FROM (
+                SELECT genre_name, COUNT(*) AS customers
+                FROM preferred
+                WHERE genre_rank = 1 AND total_spent > 0
+                GROUP BY genre_name
+            ) class_counts
+        ) AS class_counts;
+    """
+
+    @staticmethod
+    def report_path() -> str:
+        # cron jobs only get their settings from /app/.env
+        load_dotenv("/app/.env")
+        return os.getenv("DATA_PROFILE_REPORT", "/app/assets/data_profile.json")
+
+    @staticmethod
+    def _connect():
+        load_dotenv("/app/.env")
+        return psycopg2.connect(
+            user=os.getenv("SUPABASE_USER"),
+            password=os.getenv("SUPABASE_PASSWORD"),
+            host=os.getenv("SUPABASE_HOST"),
+            port=os.getenv("SUPABASE_PORT"),
+            dbname=os.getenv("SUPABASE_DBNAME")
+        )
+
+    @staticmethod
+    def _fetch_one(query):
+        connection = DataProfiler._connect()
+        try:
+            connection.set_session(readonly=True, autocommit=True)
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                columns = [column.name for column in cursor.description]
+                return dict(zip(columns, cursor.fetchone()))
+        finally:
+            connection.close()
+
+    @staticmethod
+    def profile(*, min_samples_per_class: int) -> dict:
+        """
+        Run all diagnostics and return the report as a dict.
+        """
+        started = time.perf_counter()
+        queries = [
+            DataProfiler.CUSTOMER_INVOICE_QUERY,
+            DataProfiler.TRACK_GENRE_QUERY,
+            DataProfiler.PURCHASES_QUERY
+        ]
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            customer_invoice, track_genre, purchases = executor.map(DataProfiler._fetch_one, queries)
+
+        lines = purchases['purchases']
+        class_counts = purchases['class_counts']
+        trainable_classes = [genre for genre, count in class_counts.items() if count >= min_samples_per_class]
+        dropped_classes = [genre for genre, count in class_counts.items() if count < min_samples_per_class]
+
+        report = {
+            'generated_at': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'row_counts': {
+                'customer': customer_invoice['total_customers'],
+                'invoice': customer_invoice['total_invoices'],
+                'invoice_line': lines['total_invoice_lines'],
+                'track': track_genre['total_tracks'],
+                'genre': track_genre['total_genres']
+            },
+            'orphaned_foreign_keys': {
+                'invoice.customer_id': customer_invoice['orphan_invoices'],
+                'invoice_line.invoice_id': lines['lines_with_orphan_invoice'],
+                'invoice_line.track_id': lines['lines_with_orphan_track'],
+                'track.genre_id': track_genre['tracks_with_orphan_genre']
+            },
+            'tracks_without_genre': track_genre['tracks_without_genre'],
+            'customers': {
+                'total': customer_invoice['total_customers'],
+                'with_purchases': lines['customers_with_purchases'],
+                'without_purchases': customer_invoice['total_customers'] - lines['customers_with_purchases'],
+                'with_genre_linked_purchases': lines['customers_with_genre_linked_purchases'],
+                'after_all_joins': lines['customers_after_all_joins'],
+                'training_rows': sum(class_counts.values())
+            },
+            'genre_classes': {
+                'min_samples_per_class': min_samples_per_class,
+                'class_counts': class_counts,
+                'trainable': trainable_classes,
+                'dropped': dropped_classes
+            },
+            # The classifier needs at least two genres left after filtering
+            'trainable': len(trainable_classes) >= 2
+        }
+        return report
+
+    @staticmethod
+    def write_report(report: dict, path: str = None):
+        path = path or DataProfiler.report_path()
+        # write next to the target and rename, so readers never see a partial file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        os.replace(temp_path, path)
+        logger.info("Data profile report written to %s", path)
+
+    @staticmethod
+    def check_report(path: str = None) -> bool:
+        """
+        Pre-training check. Returns False only when a recent report (younger
+        than DATA_PROFILE_MAX_AGE_HOURS) says the data is not trainable; a
+        missing, stale or unreadable report does not block training.
+        """
+        load_dotenv("/app/.env")
+        path = path or DataProfiler.report_path()
+        if not os.path.exists(path):
+            logger.info("No data profile report at %s, skipping pre-training check", path)
+            return True
+
+        try:
+            with open(path, encoding="utf-8") as report_file:
+                report = json.load(report_file)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable data profile report", extra={"report": path, "error": str(e)})
+            return True
+        if not isinstance(report, dict):
+            logger.warning("Ignoring malformed data profile report", extra={"report": path})
+            return True
+
+        max_age_hours = float(os.getenv("DATA_PROFILE_MAX_AGE_HOURS", "26"))
+        try:
+            generated_at = datetime.fromisoformat(report['generated_at'])
+            age_hours = (datetime.now(timezone.utc) - generated_at).total_seconds() / 3600
+        except (KeyError, TypeError, ValueError):
+            age_hours = None
+        if age_hours is None or age_hours > max_age_hours:
+            logger.warning(
+                "Ignoring stale data profile report",
+                extra={"report": path, "generated_at": report.get('generated_at'), "max_age_hours": max_age_hours}
+            )
+            return True
+
+        if not report.get('trainable', False):
+            logger.error(
+                "Data profile report marks the data as not trainable",
+                extra={"report": path, "genre_classes": report.get('genre_classes')}
+            )
+            return False
+
+        logger.info("Data profile check passed", extra={"report": path, "generated_at": report.get('generated_at')})
+        return True
@@ -0,0 +1,160 @@
+import math
+import threading
+from bisect import bisect_right
+
+import numpy as np
+
+
+class DriftMonitor:
+    """
+    Constant-memory drift monitor for live prediction traffic.
+
+    At training time `build_reference` stores, for each input feature, bin
+    edges at the training quantiles plus the share of training rows in each
+    bin, and the distribution of predicted genres. At serving time every
+    request increments one counter per feature and one for the predicted
+    genre (a bisect over the edges plus a counter increment). All counters
+    are preallocated when the reference is loaded.
+
+    Counters are halved every `window` observations, so scores follow
+    recent traffic instead of everything since startup. Drift is scored
+    with the Population Stability Index (PSI) against the reference.
+    """
+
+    def __init__(self, window: int = 5000, psi_threshold: float = 0.2, min_observations: int = 500):
+        self.window = window
+        self.psi_threshold = psi_threshold
+        # counts are halved once per window, so more than window / 2 would never be reached
+        self.min_observations = min(min_observations, window // 2)
+        self._lock = threading.Lock()
+        self._reference = None
+        self._reference_id = None
+
+    @staticmethod
+    def build_reference(features, feature_columns, predicted_genres, trained_at, n_bins: int = 10) -> dict:
+        """
+        Reference statistics saved with the model. `features` is the training
+        feature matrix and `predicted_genres` the model's predictions on it.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        reference = {'trained_at': trained_at, 'features': {}, 'prediction': {}}
+
+        for column, name in enumerate(feature_columns):
+            values = features[:, column]
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+            bins = np.searchsorted(edges, values, side='right')
+            counts = np.bincount(bins, minlength=len(edges) + 1)
+            reference['features'][name] = {
+                'edges': edges.tolist(),
+                'proportions': (counts / counts.sum()).tolist()
+            }
+
+        genres, counts = np.unique(np.asarray(predicted_genres, dtype=str), return_counts=True)
+        reference['prediction'] = {
+            'classes': genres.tolist(),
+            'proportions': (counts / counts.sum()).tolist()
+        }
+        return reference
+
+    def set_reference(self, reference: dict):
+        """
+        Load reference statistics and reset the counters. A no-op when the
+        same reference (same training run) is already loaded.
+        """
+        if reference is None or reference['trained_at'] == self._reference_id:
+            return
+        with self._lock:
+            if reference['trained_at'] == self._reference_id:
+                return
+            self._feature_names = list(reference['features'])
+            self._edges = [reference['features'][name]['edges'] for name in self._feature_names]
+            self._feature_counts = [[0.0] * (len(edges) + 1) for edges in self._edges]
+            self._genre_index = {genre: i for i, genre in enumerate(reference['prediction']['classes'])}
+            # last slot counts genres the reference never predicted
+            self._genre_counts = [0.0] * (len(self._genre_index) + 1)
+            self._observations = 0.0
+            self._since_decay = 0
+            self._reference = reference
+            self._reference_id = reference['trained_at']
+
+    def observe(self, features, predicted_genre):
+        if self._reference is None:
+            return
+        with self._lock:
+            for column, value in enumerate(features):
+                self._feature_counts[column][bisect_right(self._edges[column], value)] += 1
+            self._genre_counts[self._genre_index.get(predicted_genre, -1)] += 1
+            self._observations += 1
+            self._since_decay += 1
+            if self._since_decay >= self.window:
+                self._decay()
+
+    def _decay(self):
+        # Amortized O(1): runs once per window over a fixed number of counters
+        for counts in self._feature_counts:
+            for i in range(len(counts)):
+                counts[i] /= 2
+        for i in range(len(self._genre_counts)):
+            self._genre_counts[i] /= 2
+        self._observations /= 2
+        self._since_decay = 0
+
+    @staticmethod
+    def _psi(counts, reference_proportions, epsilon: float = 1e-4) -> float:
+        total = sum(counts)
+        psi = 0.0
+        for count, expected in zip(counts, reference_proportions):
+            actual = max(count / total, epsilon)
+            expected = max(expected, epsilon)
+            psi += (actual - expected) * math.log(actual / expected)
+        return psi
+
+    def drift_scores(self) -> dict:
+        # Snapshot counters and the reference they belong to together, so a
+        # concurrent set_reference cannot mix old counts with new bins
+        with self._lock:
+            reference = self._reference
+            if reference is None:
+                return {"status": "NO_REFERENCE", "observations": 0, "drift_detected": False}
+            feature_names = list(self._feature_names)
+            feature_counts = [list(counts) for counts in self._feature_counts]
+            genre_counts = list(self._genre_counts)
+            observations = self._observations
+            reference_id = self._reference_id
+
+        if observations == 0:
+            return {
+                "status": "NO_DATA",
+                "observations": 0,
+                "reference_trained_at": reference_id,
+                "drift_detected": False
+            }
+
+        # PSI over a handful of requests is dominated by empty bins
+        if observations < self.min_observations:
+            return {
+                "status": "INSUFFICIENT_DATA",
+                "observations": round(observations, 1),
+                "min_observations": self.min_observations,
+                "reference_trained_at": reference_id,
+                "drift_detected": False
+            }
+
+        features = {}
+        for name, counts in zip(feature_names, feature_counts):
+            features[name] = round(self._psi(counts, reference['features'][name]['proportions']), 4)
+
+        # unseen genres are compared against a zero reference share
+        prediction_psi = self._psi(genre_counts, reference['prediction']['proportions'] + [0.0])
+        max_psi = max(list(features.values()) + [prediction_psi])
+
+        return {
+            "status": "OK",
+            "observations": round(observations, 1),
+            "reference_trained_at": reference_id,
+            "psi_threshold": self.psi_threshold,
+            "features_psi": features,
+            "prediction_psi": round(prediction_psi, 4),
+            "max_psi": round(max_psi, 4),
+            "drift_detected": max_psi >= self.psi_threshold
+        }
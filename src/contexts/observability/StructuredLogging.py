@@ -0,0 +1,208 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+_request_sampled = contextvars.ContextVar("request_sampled", default=True)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, request_id
+    and any fields passed with `extra=`.
+    """
+
+    def __init__(self, service_name: str):
+        super().__init__()
+        self.service_name = service_name
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "service": self.service_name,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Runs on the calling thread: stamps the current request_id on the record
+    and drops sub-WARNING records of requests that were not sampled.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        record.request_id = request_id
+        if request_id is not None and record.levelno < logging.WARNING:
+            return _request_sampled.get()
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that never waits: when the background
+    listener falls behind, records are dropped and counted instead of
+    blocking the request thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here, but leave the JSON
+        # serialization to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener whose stop sentinel waits for room in the bounded queue
+    instead of failing with queue.Full at shutdown.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class StructuredLogging:
+
+    _listener = None
+    _queue_handler = None
+    _sample_rate = 1.0
+
+    @staticmethod
+    def setup(service_name: str, *, log_to_stdout: bool = True, log_file: str = None):
+        """
+        Route the root logger through a queue to a background listener that
+        writes JSON lines to stdout and/or a size-rotated file.
+
+        Configured through LOG_LEVEL, LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT,
+        LOG_QUEUE_SIZE and LOG_SAMPLE_RATE. Without LOG_FILE, logs go to
+        /app/logs/<service_name>.log when that directory exists.
+
+        RotatingFileHandler is not safe across processes: each process must
+        write its own file (the crontabs use flock so runs of the same app
+        never overlap).
+        """
+        if StructuredLogging._listener is not None:
+            return
+
+        formatter = JsonFormatter(service_name)
+        handlers = []
+
+        log_file = log_file or os.getenv("LOG_FILE")
+        if log_file is None and os.path.isdir("/app/logs"):
+            log_file = f"/app/logs/{service_name}.log"
+
+        # never drop every record: without a file, fall back to stdout
+        if log_to_stdout or not log_file:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(formatter)
+            handlers.append(stream_handler)
+        if log_file:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+                encoding="utf-8"
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(RequestContextFilter())
+
+        StructuredLogging._sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+        root = logging.getLogger()
+        root.handlers = [queue_handler]
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+        listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(StructuredLogging.shutdown)
+
+        StructuredLogging._listener = listener
+        StructuredLogging._queue_handler = queue_handler
+
+    @staticmethod
+    def shutdown():
+        """
+        Report dropped records, flush pending records and stop the
+        background listener.
+        """
+        if StructuredLogging._listener is None:
+            return
+        dropped = StructuredLogging.dropped_records()
+        if dropped:
+            # blocking put is fine here: the listener drains the queue on stop()
+            StructuredLogging._listener.queue.put(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{dropped} log records were dropped because the log queue was full",
+                "dropped_records": dropped
+            }))
+        StructuredLogging._listener.stop()
+        StructuredLogging._listener = None
+
+    @staticmethod
+    def dropped_records() -> int:
+        handler = StructuredLogging._queue_handler
+        return handler.dropped if handler is not None else 0
+
+    @staticmethod
+    def start_request(request_id: str = None):
+        """
+        Bind a request id (generated if not given) to the current context and
+        decide whether this request's logs are sampled (LOG_SAMPLE_RATE).
+        Returns the request id and a token for `end_request`.
+        """
+        request_id = request_id or uuid.uuid4().hex
+        sample_rate = StructuredLogging._sample_rate
+        tokens = (
+            _request_id.set(request_id),
+            _request_sampled.set(sample_rate >= 1.0 or random.random() < sample_rate)
+        )
+        return request_id, tokens
+
+    @staticmethod
+    def end_request(tokens):
+        id_token, sampled_token = tokens
+        _request_sampled.reset(sampled_token)
+        _request_id.reset(id_token)
@@ -0,0 +1,2 @@
+from .StructuredLogging import StructuredLogging
+from .DriftMonitor import DriftMonitor
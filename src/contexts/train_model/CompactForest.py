@@ -0,0 +1,155 @@
+import numpy as np
+
+
+class CompactForest:
+    """
+    Flat, hard-voting representation of a fitted sklearn forest classifier.
+
+    Nodes of every tree are stored in pre-order, so the left child of an
+    internal node is always the next node and only the right child has to be
+    stored. Thresholds are float32 (sklearn compares features as float32 as
+    well) and features, leaf classes and child offsets are int16 where they
+    fit. Sibling leaves that vote for the same class are merged into their
+    parent.
+    """
+
+    def __init__(self, feature, threshold, right, leaf_class, tree_offsets, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.right = right
+        self.leaf_class = leaf_class
+        self.tree_offsets = tree_offsets
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.max_depth = self._max_depth()
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.tree_offsets) - 1
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        trees = [cls._compact_tree(estimator.tree_) for estimator in forest.estimators_]
+        return cls._from_trees(trees, np.asarray(forest.classes_), forest.n_features_in_)
+
+    @classmethod
+    def _from_trees(cls, trees, classes, n_features):
+        sizes = [len(feature) for feature, _, _, _ in trees]
+        index_dtype = np.int16 if max(sizes) <= np.iinfo(np.int16).max else np.int32
+        return cls(
+            feature=np.concatenate([t[0] for t in trees]).astype(np.int16),
+            threshold=np.concatenate([t[1] for t in trees]).astype(np.float32),
+            right=np.concatenate([t[2] for t in trees]).astype(index_dtype),
+            leaf_class=np.concatenate([t[3] for t in trees]).astype(np.int16),
+            tree_offsets=np.concatenate([[0], np.cumsum(sizes)]).astype(np.int32),
+            classes=classes,
+            n_features=n_features
+        )
+
+    @staticmethod
+    def _compact_tree(tree):
+        children_left = tree.children_left
+        children_right = tree.children_right
+        node_class = tree.value[:, 0, :].argmax(axis=1)
+
+        # Bottom-up: a subtree collapses to a leaf when all its leaves vote alike
+        merged_class = {}
+
+        def merge(node):
+            if children_left[node] == -1:
+                merged_class[node] = int(node_class[node])
+            else:
+                left_class = merge(children_left[node])
+                right_class = merge(children_right[node])
+                merged_class[node] = left_class if left_class is not None and left_class == right_class else None
+            return merged_class[node]
+
+        merge(0)
+
+        feature, threshold, right, leaf_class = [], [], [], []
+
+        def emit(node):
+            index = len(feature)
+            if merged_class[node] is not None:
+                feature.append(-1)
+                threshold.append(0.0)
+                right.append(-1)
+                leaf_class.append(merged_class[node])
+                return index
+            feature.append(int(tree.feature[node]))
+            threshold.append(CompactForest._float32_floor(tree.threshold[node]))
+            right.append(-1)
+            leaf_class.append(-1)
+            emit(children_left[node])
+            right[index] = emit(children_right[node])
+            return index
+
+        emit(0)
+        return np.array(feature), np.array(threshold, dtype=np.float32), np.array(right), np.array(leaf_class)
+
+    @staticmethod
+    def _float32_floor(value: float) -> np.float32:
+        # Largest float32 <= value, so `x <= threshold` keeps sklearn's result
+        # for every float32 x
+        rounded = np.float32(value)
+        if rounded > value:
+            rounded = np.nextafter(rounded, np.float32(-np.inf))
+        return rounded
+
+    def _max_depth(self) -> int:
+        depth = 0
+        for tree in range(self.n_estimators):
+            start = self.tree_offsets[tree]
+            stack = [(0, 0)]
+            while stack:
+                node, node_depth = stack.pop()
+                depth = max(depth, node_depth)
+                if self.feature[start + node] >= 0:
+                    stack.append((node + 1, node_depth + 1))
+                    stack.append((int(self.right[start + node]), node_depth + 1))
+        return depth
+
+    def subset(self, tree_indices):
+        """New forest with only the given trees."""
+        trees = []
+        for tree in tree_indices:
+            start, end = self.tree_offsets[tree], self.tree_offsets[tree + 1]
+            trees.append((
+                self.feature[start:end],
+                self.threshold[start:end],
+                self.right[start:end],
+                self.leaf_class[start:end]
+            ))
+        return CompactForest._from_trees(trees, self.classes_, self.n_features_in_)
+
+    def tree_votes(self, X) -> np.ndarray:
+        """
+        Class index voted by each tree for each row, shape (n_trees, n_rows).
+        All trees are walked together, one level per iteration.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(X.shape[0])
+        roots = self.tree_offsets[:-1, None]
+        nodes = np.repeat(roots, X.shape[0], axis=1)
+
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, feature, 0)] <= self.threshold[nodes]
+            children = np.where(go_left, nodes + 1, roots + self.right[nodes])
+            nodes = np.where(internal, children, nodes)
+
+        return self.leaf_class[nodes]
+
+    def predict(self, X) -> np.ndarray:
+        votes = self.tree_votes(X)
+        counts = np.stack([(votes == c).sum(axis=0) for c in range(len(self.classes_))])
+        return self.classes_[counts.argmax(axis=0)]
@@ -0,0 +1,193 @@
+import io
+import logging
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+from src.contexts.train_model.CompactForest import CompactForest
+
+
+logger = logging.getLogger(__name__)
+
+
+class ForestCompressor:
+    """
+    Post-training compression of a RandomForestClassifier within an
+    accuracy-loss budget measured on the held-out split.
+
+    1. Convert to a CompactForest (merged leaves, float32/int16 storage) and
+       check that every compact tree votes exactly like its sklearn tree.
+    2. Greedily pick the smallest subset of trees whose out-of-bag vote on
+       the training split stays within the budget, dropping redundant trees.
+    3. Optionally distill the forest into a smaller one trained on the
+       teacher's predictions.
+
+    Candidates are selected without looking at the test split; the test
+    split is only used for the final budget check. If no candidate meets
+    the budget the original model is kept.
+    """
+
+    @staticmethod
+    def compress(model, X_train, y_train, X_test, y_test, *, max_accuracy_loss=0.01, min_trees=10,
+                 distill=False, distill_n_estimators=10):
+        """
+        Returns (model_to_save, report). `report` compares size, load time,
+        per-row latency and accuracy of the original and compressed models.
+        """
+        baseline_accuracy = accuracy_score(y_test, model.predict(X_test))
+        target_accuracy = baseline_accuracy - max_accuracy_loss
+        report = {
+            'max_accuracy_loss': max_accuracy_loss,
+            'applied': False,
+            'original': ForestCompressor._measure(model, X_test, y_test),
+        }
+
+        compact = CompactForest.from_sklearn(model)
+        if not ForestCompressor._votes_match(model, compact, np.vstack([X_train, X_test])):
+            logger.error("CompactForest votes differ from the sklearn trees, keeping the original model")
+            return model, report
+
+        candidates = [compact]
+        pruned = ForestCompressor._prune_trees(model, compact, X_train, y_train, max_accuracy_loss, min_trees)
+        if pruned is not None:
+            candidates.append(pruned)
+
+        if distill:
+            student = RandomForestClassifier(
+                n_estimators=distill_n_estimators,
+                random_state=42,
+                max_depth=model.max_depth,
+                min_samples_split=model.min_samples_split
+            )
+            student.fit(X_train, model.predict(X_train))
+            candidates.append(CompactForest.from_sklearn(student))
+
+        compressed = None
+        for candidate in sorted(candidates, key=lambda forest: forest.node_count):
+            if accuracy_score(y_test, candidate.predict(X_test)) >= target_accuracy:
+                compressed = candidate
+                break
+
+        if compressed is None:
+            logger.warning("No compressed forest within the accuracy budget, keeping the original model")
+            return model, report
+
+        report['applied'] = True
+        report['compressed'] = ForestCompressor._measure(compressed, X_test, y_test)
+        return compressed, report
+
+    @staticmethod
+    def _votes_match(model, compact, X) -> bool:
+        """
+        Parity check of the compact layout: each compact tree must vote for
+        the same class as the sklearn tree it came from. With pure leaves
+        this also makes the compact forest predict exactly like the original.
+        """
+        expected = np.array([estimator.predict(X) for estimator in model.estimators_]).astype(np.int64)
+        return bool(np.array_equal(compact.tree_votes(X), expected))
+
+    @staticmethod
+    def _oob_mask(model, n_samples):
+        """
+        (n_trees, n_samples) mask of the rows each tree did not see, rebuilt
+        from the bootstrap seed sklearn uses for each tree. Returns None when
+        the forest was not bootstrapped or the rebuilt samples do not match
+        the fitted trees.
+        """
+        if not model.bootstrap or model.max_samples is not None:
+            return None
+        mask = np.ones((len(model.estimators_), n_samples), dtype=bool)
+        for tree, estimator in enumerate(model.estimators_):
+            sampled = np.random.RandomState(estimator.random_state).randint(0, n_samples, n_samples)
+            mask[tree, sampled] = False
+            # the root of each tree counts the distinct rows it was fitted on
+            if estimator.tree_.n_node_samples[0] != n_samples - mask[tree].sum():
+                return None
+        return mask
+
+    @staticmethod
+    def _prune_trees(model, compact, X_train, y_train, max_accuracy_loss, min_trees):
+        """
+        Forward selection on out-of-bag votes: repeatedly add the tree that
+        most improves the OOB accuracy of the vote, until at least
+        `min_trees` trees are selected and the OOB accuracy is within
+        `max_accuracy_loss` of the full forest's. Returns None when OOB
+        samples are not available.
+        """
+        oob = ForestCompressor._oob_mask(model, len(y_train))
+        if oob is None:
+            logger.warning("Out-of-bag samples unavailable, skipping tree pruning")
+            return None
+
+        votes = compact.tree_votes(X_train)
+        class_index = np.searchsorted(compact.classes_, y_train)
+        n_classes = len(compact.classes_)
+        rows = np.arange(len(y_train))
+
+        def oob_accuracy(vote_counts):
+            voted = vote_counts.sum(axis=1) > 0
+            if not voted.any():
+                return 0.0
+            return np.mean(vote_counts[voted].argmax(axis=1) == class_index[voted])
+
+        full_counts = np.zeros((len(y_train), n_classes), dtype=np.int32)
+        for tree in range(compact.n_estimators):
+            np.add.at(full_counts, (rows[oob[tree]], votes[tree, oob[tree]]), 1)
+        target_accuracy = oob_accuracy(full_counts) - max_accuracy_loss
+
+        vote_counts = np.zeros((len(y_train), n_classes), dtype=np.int32)
+        remaining = list(range(compact.n_estimators))
+        selected = []
+
+        while remaining:
+            best_tree, best_accuracy = None, -1.0
+            for tree in remaining:
+                tree_rows = rows[oob[tree]]
+                vote_counts[tree_rows, votes[tree, oob[tree]]] += 1
+                accuracy = oob_accuracy(vote_counts)
+                vote_counts[tree_rows, votes[tree, oob[tree]]] -= 1
+                if accuracy > best_accuracy:
+                    best_tree, best_accuracy = tree, accuracy
+
+            vote_counts[rows[oob[best_tree]], votes[best_tree, oob[best_tree]]] += 1
+            selected.append(best_tree)
+            remaining.remove(best_tree)
+            if len(selected) >= min_trees and best_accuracy >= target_accuracy:
+                break
+
+        return compact.subset(sorted(selected))
+
+    @staticmethod
+    def _measure(model, X_test, y_test, repetitions=100):
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        size_bytes = buffer.tell()
+
+        buffer.seek(0)
+        started = time.perf_counter()
+        joblib.load(buffer)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        row = X_test[:1]
+        started = time.perf_counter()
+        for _ in range(repetitions):
+            model.predict(row)
+        row_latency_us = (time.perf_counter() - started) / repetitions * 1e6
+
+        if isinstance(model, CompactForest):
+            n_trees, n_nodes = model.n_estimators, model.node_count
+        else:
+            n_trees = len(model.estimators_)
+            n_nodes = sum(estimator.tree_.node_count for estimator in model.estimators_)
+
+        return {
+            'n_trees': int(n_trees),
+            'n_nodes': int(n_nodes),
+            'size_bytes': int(size_bytes),
+            'load_ms': round(load_ms, 3),
+            'row_latency_us': round(row_latency_us, 1),
+            'accuracy': round(float(accuracy_score(y_test, model.predict(X_test))), 4)
+        }
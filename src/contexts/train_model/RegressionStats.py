@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class RegressionStats:
+    """
+    Sufficient statistics for a simple linear regression y = a + b*x, kept
+    centered (count, means, co-moments) so chunks can be merged in any order
+    without loss of precision. Memory is constant regardless of row count.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        """Merge a chunk of observations (Chan et al. parallel update)."""
+        n_b = len(x)
+        if n_b == 0:
+            return
+        mean_x_b = float(x.mean())
+        mean_y_b = float(y.mean())
+        dx_b = x - mean_x_b
+        dy_b = y - mean_y_b
+        sxx_b = float(dx_b @ dx_b)
+        syy_b = float(dy_b @ dy_b)
+        sxy_b = float(dx_b @ dy_b)
+
+        n = self.n + n_b
+        delta_x = mean_x_b - self.mean_x
+        delta_y = mean_y_b - self.mean_y
+        weight = self.n * n_b / n
+
+        self.sxx += sxx_b + delta_x * delta_x * weight
+        self.syy += syy_b + delta_y * delta_y * weight
+        self.sxy += sxy_b + delta_x * delta_y * weight
+        self.mean_x += delta_x * n_b / n
+        self.mean_y += delta_y * n_b / n
+        self.n = n
+
+    def coefficients(self):
+        """Least-squares (intercept, slope)."""
+        if not all(np.isfinite([self.mean_x, self.mean_y, self.sxx, self.syy, self.sxy])):
+            raise ValueError("Regression statistics are not finite")
+        if self.n < 2 or self.sxx == 0.0:
+            raise ValueError("At least two distinct x values are needed to fit the regression")
+        slope = self.sxy / self.sxx
+        intercept = self.mean_y - slope * self.mean_x
+        if not (np.isfinite(slope) and np.isfinite(intercept)):
+            raise ValueError("Regression coefficients are not finite")
+        return intercept, slope
+
+    def evaluate(self, intercept: float, slope: float):
+        """
+        MSE and R² of y = intercept + slope*x over the observations in these
+        statistics, without revisiting the rows.
+        """
+        if self.n == 0:
+            return None, None
+        mean_residual = self.mean_y - intercept - slope * self.mean_x
+        sse = self.syy - 2 * slope * self.sxy + slope * slope * self.sxx + self.n * mean_residual ** 2
+        mse = sse / self.n
+        r2 = 1.0 - sse / self.syy if self.syy > 0 else None
+        return mse, r2
@@ -1,8 +1,10 @@
+import logging
 import numpy as np
 import joblib
 import pandas as pd
 import psycopg2
 import os
+import time
 from dotenv import load_dotenv
 from collections import Counter
 
@@ -11,14 +13,25 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score
 
+from src.contexts.data_profile.DataProfiler import DataProfiler
+from src.contexts.observability import DriftMonitor
+from src.contexts.train_model.ForestCompressor import ForestCompressor
+
+
+logger = logging.getLogger(__name__)
+
 
 class TrainGenreModel:
 
+    # Genres with fewer customers than this are dropped before training
+    MIN_SAMPLES_PER_CLASS = 2
+
     @staticmethod
     def get_customer_features(customer_id, connection):
         """
         Extract features for a specific customer from the database.
         Returns a dictionary with the customer's features or None if customer not found.
+        Database errors (including statement timeouts) are re-raised.
         """
         try:
             with connection.cursor() as cursor:
@@ -91,9 +104,12 @@ class TrainGenreModel:
                         }
                     else:
                         return None  # Customer doesn't exist
-                        
+
+        except psycopg2.Error:
+            # Let database failures reach the caller (deadline / circuit breaker)
+            raise
         except Exception as e:
-            print(f"Error extracting customer features: {e}")
+            logger.exception("Error extracting customer features: %s", e)
             return None
 
     @staticmethod
@@ -102,6 +118,10 @@ class TrainGenreModel:
         Trains a classification model to predict customer music genre preferences
         based on their purchase history and demographic data.
         """
+
+        if not DataProfiler.check_report():
+            logger.error("Aborting training, see the data profile report")
+            return
         
         # Load environment variables
         load_dotenv("/app/.env")
@@ -112,10 +132,10 @@ class TrainGenreModel:
         DBNAME = os.getenv("SUPABASE_DBNAME")
         
         if PORT is None:
-            print("Error: Environment variables not loaded")
+            logger.error("Environment variables not loaded")
             return
         else:
-            print("Environment variables loaded successfully")
+            logger.info("Environment variables loaded successfully")
 
         try:
             with psycopg2.connect(
@@ -176,22 +196,22 @@ class TrainGenreModel:
                     cursor.execute(query)
                     rows = cursor.fetchall()
                     
-                    print(f"Retrieved {len(rows)} customer records for training")
+                    logger.info("Retrieved %d customer records for training", len(rows))
 
         except Exception as e:
-            print(f"Error connecting to database or executing query: {e}")
+            logger.exception("Error connecting to database or executing query: %s", e)
             return
         
         if not rows:
-            print("No customer data retrieved. Aborting training.")
+            logger.error("No customer data retrieved. Aborting training.")
             return
 
         # Convert to DataFrame for easier manipulation
         columns = ['customer_id', 'preferred_genre', 'total_spent', 'total_tracks_bought', 'genre_spending_ratio']
         df = pd.DataFrame(rows, columns=columns)
         
-        print(f"Sample data:\n{df.head()}")
-        print(f"\nGenre distribution:\n{df['preferred_genre'].value_counts()}")
+        logger.info("Sample data:\n%s", df.head())
+        logger.info("Genre distribution:\n%s", df['preferred_genre'].value_counts())
         
         # Prepare features for training
         # We'll use total_spent, total_tracks_bought, genre_spending_ratio
@@ -209,24 +229,24 @@ class TrainGenreModel:
         # Check class distribution and filter out classes with too few samples
         from collections import Counter
         class_counts = Counter(y)
-        min_samples_per_class = 2
+        min_samples_per_class = TrainGenreModel.MIN_SAMPLES_PER_CLASS
         
         # Filter out classes with less than min_samples_per_class
         valid_classes = [cls for cls, count in class_counts.items() if count >= min_samples_per_class]
         
         if len(valid_classes) < len(class_counts):
-            print("Filtering out genres with insufficient samples:")
+            logger.info("Filtering out genres with insufficient samples:")
             for cls, count in class_counts.items():
                 if count < min_samples_per_class:
                     genre_name = le_genre.inverse_transform([cls])[0]
-                    print(f"  - {genre_name}: {count} samples (minimum required: {min_samples_per_class})")
+                    logger.info("  - %s: %d samples (minimum required: %d)", genre_name, count, min_samples_per_class)
             
             # Filter the data to include only valid classes
             valid_mask = np.isin(y, valid_classes)
             X = X[valid_mask]
             y = y[valid_mask]
             
-            print(f"Training with {len(valid_classes)} genres and {len(X)} samples")
+            logger.info("Training with %d genres and %d samples", len(valid_classes), len(X))
         
         # Split the data - use stratify only if we have enough samples per class
         if len(X) >= 10 and all(class_counts[cls] >= 2 for cls in np.unique(y)):
@@ -253,36 +273,67 @@ class TrainGenreModel:
         y_pred = model.predict(X_test)
         accuracy = accuracy_score(y_test, y_pred)
         
-        print(f"\nModel Accuracy: {accuracy:.3f}")
-        print("\nClassification Report:")
+        logger.info("Model Accuracy: %.3f", accuracy)
         
         # Get the actual classes used in training (after filtering)
         unique_classes_in_training = np.unique(y_train)
         actual_genre_names = [le_genre.inverse_transform([cls])[0] for cls in unique_classes_in_training]
         
-        print(classification_report(y_test, y_pred, 
+        logger.info("Classification Report:\n%s", classification_report(y_test, y_pred, 
                                   target_names=actual_genre_names,
                                   labels=unique_classes_in_training))
+
+        # Compress the forest for serving, within an accuracy-loss budget on the test split
+        serving_model = model
+        compression_report = None
+        if os.getenv("GENRE_COMPRESSION_ENABLED", "true").lower() == "true":
+            serving_model, compression_report = ForestCompressor.compress(
+                model, X_train, y_train, X_test, y_test,
+                max_accuracy_loss=float(os.getenv("GENRE_COMPRESSION_MAX_ACCURACY_LOSS", "0.01")),
+                min_trees=int(os.getenv("GENRE_COMPRESSION_MIN_TREES", "10")),
+                distill=os.getenv("GENRE_COMPRESSION_DISTILL", "false").lower() == "true",
+                distill_n_estimators=int(os.getenv("GENRE_COMPRESSION_DISTILL_TREES", "10"))
+            )
+            logger.info("Forest compression report", extra={"compression": compression_report})
+        
+        # Precompute a prediction for every known customer so the API can
+        # still answer while the feature database is unavailable
+        all_predictions = le_genre.inverse_transform(serving_model.predict(df[feature_columns].values))
+        precomputed_predictions = {
+            int(customer_id): str(genre)
+            for customer_id, genre in zip(df['customer_id'], all_predictions)
+        }
+
+        # Reference distributions the API compares live traffic against
+        trained_at = time.time()
+        reference_stats = DriftMonitor.build_reference(
+            df[feature_columns].values, feature_columns, all_predictions, trained_at
+        )
         
         # Save the model and encoders
         model_data = {
-            'model': model,
+            'model': serving_model,
             'label_encoders': {
                 'genre': le_genre
             },
             'feature_columns': feature_columns,
-            'genre_classes': le_genre.classes_
+            'genre_classes': le_genre.classes_,
+            'precomputed_predictions': precomputed_predictions,
+            'trained_at': trained_at,
+            'compression_report': compression_report,
+            'reference_stats': reference_stats
         }
         
         model_path = os.getenv("MODELO_GENERO_ENTRENADO", "/app/assets/modelo_genero_entrenado.pkl")
         joblib.dump(model_data, model_path)
         
-        print(f"Genre classification model trained and saved to {model_path}")
+        logger.info("Genre classification model trained and saved to %s", model_path)
         
         # Print feature importance
         feature_names = ['Total Spent', 'Total Tracks', 'Genre Ratio']
         importances = model.feature_importances_
         
-        print("\nFeature Importance:")
-        for name, importance in zip(feature_names, importances):
-            print(f"{name}: {importance:.3f}")
\ No newline at end of file
+        logger.info(
+            "Feature Importance:\n%s",
+            "\n".join(f"{name}: {importance:.3f}" for name, importance in zip(feature_names, importances))
+        )
\ No newline at end of file
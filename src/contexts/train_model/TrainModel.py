@@ -1,18 +1,32 @@
+import logging
+import zlib
 import numpy as np
 import joblib
-import pandas as pd
 import psycopg2
 import os
 from dotenv import load_dotenv
+from psycopg2 import sql
 
-
-from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
+
+from src.contexts.train_model.RegressionStats import RegressionStats
+
+
+logger = logging.getLogger(__name__)
 
 class TrainModel:
 
-    def entrenarModelo():
+    @staticmethod
+    def entrenarModelo(incremental=False):
+        """
+        Entrena la regresión lineal leyendo "Dataset" por bloques con un cursor
+        del lado del servidor; la memoria no depende del tamaño de la tabla.
+
+        Cada fila va a entrenamiento o a prueba según un hash estable, y solo se
+        acumulan estadísticas suficientes (RegressionStats), que se guardan junto
+        al modelo. Con incremental=True y DATASET_WATERMARK_COLUMN definida, solo
+        se leen las filas nuevas y se suman a las estadísticas guardadas.
+        """
 
         #se usaron las credeciales para ingresar de manera ocacional (Transaction pooler)
         load_dotenv("/app/.env")
@@ -24,12 +38,54 @@ class TrainModel:
         
 
         if(PORT== None):
-            print("no se lee el env")
+            logger.error("no se lee el env")
             return
         else:
-            print("si se lee en env")
+            logger.info("si se lee en env")
 
+        model_path = str(os.getenv("MODELO_ENTRENADO"))
+        state_path = os.getenv("MODELO_ENTRENADO_STATE", f"{model_path}.state.pkl")
+        chunk_size = int(os.getenv("DATASET_CHUNK_SIZE", "10000"))
+        holdout_percent = int(os.getenv("DATASET_HOLDOUT_PERCENT", "20"))
+        watermark_column = os.getenv("DATASET_WATERMARK_COLUMN")
 
+        # estado previo: estadísticas acumuladas y última marca leída. Solo sirve si
+        # se guardó con la misma columna de marca; si no, las filas se sumarían dos
+        # veces y el hash de prueba cambiaría de clave.
+        state = None
+        if incremental and watermark_column and os.path.exists(state_path):
+            state = joblib.load(state_path)
+            if state.get('watermark') is None or state.get('watermark_column') != watermark_column:
+                state = None
+        if state is not None:
+            logger.info("Actualización incremental desde %s > %s", watermark_column, state['watermark'])
+        else:
+            if incremental:
+                logger.warning("Sin estado previo compatible o sin DATASET_WATERMARK_COLUMN, se reentrena con toda la tabla")
+            state = {
+                'train': RegressionStats(),
+                'holdout': RegressionStats(),
+                'watermark': None,
+                'watermark_column': watermark_column or None,
+                'rows': 0
+            }
+
+        if watermark_column and state['watermark'] is not None:
+            query = sql.SQL('SELECT x, y, {col} FROM "Dataset" WHERE {col} > %s AND x IS NOT NULL AND y IS NOT NULL ORDER BY {col};').format(
+                col=sql.Identifier(watermark_column)
+            )
+            params = (state['watermark'],)
+        elif watermark_column:
+            query = sql.SQL('SELECT x, y, {col} FROM "Dataset" WHERE x IS NOT NULL AND y IS NOT NULL ORDER BY {col};').format(
+                col=sql.Identifier(watermark_column)
+            )
+            params = None
+        else:
+            query = sql.SQL('SELECT x, y FROM "Dataset" WHERE x IS NOT NULL AND y IS NOT NULL;')
+            params = None
+
+        new_rows = 0
+        skipped_rows = 0
         try:
             with psycopg2.connect(
                 user=USER,
@@ -38,38 +94,71 @@ class TrainModel:
                 port=PORT,
                 dbname=DBNAME
             ) as connection:
-                with connection.cursor() as cursor:
-                    # Consulta SQL
-                    cursor.execute('SELECT x, y FROM "Dataset";')
-                    rows = cursor.fetchall()  # devuelve una lista de tuplas [(x1,y1),(x2,y2),...]
-                    
-                    print(f"Filas recuperadas: {len(rows)}")
+                # cursor con nombre = cursor del lado del servidor, trae las filas por bloques
+                with connection.cursor(name="dataset_stream") as cursor:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query, params)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+
+                        data_array = np.array([row[:2] for row in rows], dtype=np.float64)
+                        # la fila va a prueba según un hash estable de su clave (marca o valores)
+                        keys = [row[2] if watermark_column else row[:2] for row in rows]
+                        holdout = np.array(
+                            [zlib.crc32(str(key).encode()) % 100 < holdout_percent for key in keys]
+                        )
+                        # numeric admite 'NaN'; esas filas se descartan
+                        finite = np.isfinite(data_array).all(axis=1)
+                        skipped_rows += int((~finite).sum())
+                        train = finite & ~holdout
+                        test = finite & holdout
+
+                        state['train'].update(data_array[train, 0], data_array[train, 1])
+                        state['holdout'].update(data_array[test, 0], data_array[test, 1])
+                        if watermark_column:
+                            state['watermark'] = rows[-1][2]
+                        new_rows += len(rows)
+
+                    logger.info("Filas recuperadas: %d (descartadas por valores no finitos: %d)", new_rows, skipped_rows)
 
         except Exception as e:
-            print(f"Error al conectar o recuperar datos: {e}")
+            logger.exception("Error al conectar o recuperar datos: %s", e)
             return
         
-        if not rows:
-            print("No se recuperaron filas de la base de datos. Abortando entrenamiento.")
+        if new_rows == 0 and state['rows'] == 0:
+            logger.error("No se recuperaron filas de la base de datos. Abortando entrenamiento.")
             return
-        else:
-            print(rows[:2])
-            
-
-        # Convertir la lista de tuplas a un array de NumPy
-        data_array = np.array(rows)  # shape (num_filas, 2)
+        state['rows'] += new_rows
 
-        # Separar columnas
-        x = data_array[:, 0].reshape(-1, 1)  # 100 x 1
-        y = data_array[:, 1].reshape(-1, 1)  # 100 x 1
+        try:
+            intercept, slope = state['train'].coefficients()
+        except ValueError as e:
+            logger.error("No se puede entrenar el modelo: %s", e)
+            return
 
-        #dividir en entranamiento y prueba
-        x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.2, random_state=42)
-        
-        #entrenar el modelo
-        
+        # mismo formato que LinearRegression.fit con y de forma (n, 1)
         model = LinearRegression()
-        model.fit(x_train, y_train)
-        joblib.dump(model, str(os.getenv("MODELO_ENTRENADO")))
-        print("modelo entrenado")
-        
+        model.coef_ = np.array([[slope]])
+        model.intercept_ = np.array([intercept])
+        model.n_features_in_ = 1
+        model.rank_ = 1
+
+        mse, r2 = state['holdout'].evaluate(intercept, slope)
+        logger.info(
+            "Métricas en prueba",
+            extra={
+                "mse": mse,
+                "r2": r2,
+                "train_rows": state['train'].n,
+                "holdout_rows": state['holdout'].n,
+                "new_rows": new_rows
+            }
+        )
+
+        # primero el estado: si falla el guardado del modelo, el siguiente
+        # entrenamiento lo reconstruye sin volver a sumar filas
+        joblib.dump(state, state_path)
+        joblib.dump(model, model_path)
+        logger.info("modelo entrenado")